@@ -1,6 +1,7 @@
 import streamlit as st
 import sqlite3
 import pandas as pd
+import numpy as np
 import hashlib
 from datetime import datetime, timedelta
 import plotly.express as px
@@ -8,10 +9,13 @@ import os
 from PIL import Image
 import time
 import threading
-import pytz
+from contextlib import contextmanager
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from streamlit_autorefresh import st_autorefresh
 
 # Set timezone to India (Chennai)
-INDIA_TZ = pytz.timezone('Asia/Kolkata')  # Chennai uses Kolkata timezone
+INDIA_TZ = ZoneInfo('Asia/Kolkata')  # Chennai uses Kolkata timezone
 
 
 def get_india_time():
@@ -19,14 +23,15 @@ def get_india_time():
     return datetime.now(INDIA_TZ)
 
 
+@lru_cache(maxsize=256)
 def format_india_time(dt_str):
-    """Format datetime string to India timezone"""
+    """Format datetime (or datetime string) to India timezone"""
     if not dt_str:
         return "Not Set"
     try:
-        dt = datetime.fromisoformat(dt_str)
+        dt = dt_str if isinstance(dt_str, datetime) else datetime.fromisoformat(dt_str)
         if dt.tzinfo is None:
-            dt = INDIA_TZ.localize(dt)
+            dt = dt.replace(tzinfo=INDIA_TZ)
         else:
             dt = dt.astimezone(INDIA_TZ)
         return dt.strftime("%Y-%m-%d %H:%M:%S IST")
@@ -34,226 +39,463 @@ def format_india_time(dt_str):
         return "Invalid Time"
 
 
+# Database connection (shared across reruns and sessions)
+@st.cache_resource
+def get_conn():
+    """Get the shared SQLite connection used for writes and schema setup"""
+    conn = sqlite3.connect('voting_system.db', check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=134217728')
+    conn.execute('PRAGMA cache_size=-20000')
+    return conn
+
+
+@st.cache_resource
+def get_read_conn():
+    """Get the read-only SQLite connection used by every read helper"""
+    conn = sqlite3.connect('file:voting_system.db?mode=ro', uri=True, check_same_thread=False,
+                           isolation_level=None)
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.execute('PRAGMA mmap_size=134217728')
+    conn.execute('PRAGMA cache_size=-20000')
+    return conn
+
+
+@st.cache_resource
+def _write_lock():
+    """Get the process-wide lock that serializes writes on the shared connection"""
+    return threading.Lock()
+
+
+@st.cache_resource
+def _db_version_counter():
+    """Get the process-wide counter bumped after every committed write"""
+    return {'version': 0}
+
+
+def _db_version():
+    """Get the current database write version (used as a cache key)"""
+    return _db_version_counter()['version']
+
+
+@contextmanager
+def write_transaction():
+    """Run a block of writes on the shared connection as one serialized transaction"""
+    conn = get_conn()
+    with _write_lock():
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            # Never leave the shared connection inside an open transaction
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        _db_version_counter()['version'] += 1
+
+
 # Database initialization
 def init_database():
-    """Initialize SQLite database with required tables"""
-    conn = sqlite3.connect('voting_system.db')
-    cursor = conn.cursor()
+    """Initialize SQLite database with required tables (all in one transaction)"""
+    with write_transaction() as conn:
+        cursor = conn.cursor()
 
-    # Create students table with proper primary key constraint
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS students (
-            register_number TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            registration_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+        # Create students table with proper primary key constraint
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS students (
+                register_number TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                registration_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Create votes table with proper foreign key
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS votes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                register_number TEXT NOT NULL,
+                candidate TEXT NOT NULL,
+                vote_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (register_number) REFERENCES students (register_number)
+            )
+        ''')
+
+        # Create voting_settings table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS voting_settings (
+                id INTEGER PRIMARY KEY,
+                voting_start_time TIMESTAMP,
+                voting_end_time TIMESTAMP,
+                voting_enabled BOOLEAN DEFAULT 1,
+                auto_declare_winner BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Settings live in a single row with id 1 (older databases may hold it under another id)
+        cursor.execute('UPDATE OR REPLACE voting_settings SET id = 1 WHERE id <> 1')
+
+        # Create vote_tally table, kept in sync with votes by triggers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vote_tally (
+                candidate TEXT PRIMARY KEY,
+                n INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_vote_ins AFTER INSERT ON votes
+            BEGIN
+                UPDATE vote_tally SET n = n + 1 WHERE candidate = NEW.candidate;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_vote_del AFTER DELETE ON votes
+            BEGIN
+                UPDATE vote_tally SET n = n - 1 WHERE candidate = OLD.candidate;
+            END
+        ''')
+
+        # Recount the tally whenever its rows are missing (new table, or rows deleted by hand)
+        cursor.execute("INSERT OR IGNORE INTO vote_tally (candidate, n) VALUES ('Messi', 0), ('Ronaldo', 0)")
+        if cursor.rowcount > 0:
+            cursor.execute('''
+                UPDATE vote_tally
+                SET n = (SELECT COUNT(*) FROM votes WHERE votes.candidate = vote_tally.candidate)
+            ''')
+
+        # Before the one-vote-per-student index exists, keep only each student's first vote
+        # (older databases may hold duplicates from the check-then-insert voting path)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_votes_reg'")
+        if cursor.fetchone() is None:
+            cursor.execute('''
+                DELETE FROM votes
+                WHERE id NOT IN (SELECT MIN(id) FROM votes GROUP BY register_number)
+            ''')
+            if cursor.rowcount > 0:
+                print(f"Removed {cursor.rowcount} duplicate vote(s) before creating idx_votes_reg")
+
+        # Indexes for vote lookups and listings (the unique one also enforces one vote per student)
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_votes_reg ON votes(register_number)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_votes_time ON votes(vote_time DESC)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_students_regtime_reg
+            ON students(registration_time DESC, register_number)
+        ''')
+
+
+def refresh_planner_stats():
+    """Refresh stale planner statistics so the indexes keep getting used as tables grow"""
+    conn = get_conn()
+    conn.execute('PRAGMA analysis_limit=1000')
+    if sqlite3.sqlite_version_info >= (3, 46, 0):
+        # Re-analyzes only tables whose stats are missing or whose size changed a lot
+        conn.execute('PRAGMA optimize=0x10002')
+    else:
+        # Older optimize ignores stale stats at startup; a bounded ANALYZE is cheap
+        conn.execute('ANALYZE')
 
-    # Create votes table with proper foreign key
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS votes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            register_number TEXT NOT NULL,
-            candidate TEXT NOT NULL,
-            vote_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (register_number) REFERENCES students (register_number)
-        )
-    ''')
 
-    # Create voting_settings table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS voting_settings (
-            id INTEGER PRIMARY KEY,
-            voting_start_time TIMESTAMP,
-            voting_end_time TIMESTAMP,
-            voting_enabled BOOLEAN DEFAULT 1,
-            auto_declare_winner BOOLEAN DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+@st.cache_resource
+def _bootstrap():
+    """Run init_database once per process instead of on every rerun"""
+    init_database()
+    refresh_planner_stats()
+    return True
+
+
+def _clear_vote_caches():
+    """Drop cached vote tallies after the votes table changes"""
+    get_vote_results.clear()
+    get_total_votes.clear()
+    get_admin_snapshot.clear()
 
-    conn.commit()
-    conn.close()
+
+def _clear_student_caches():
+    """Drop cached student counts after the students table changes"""
+    get_student_count.clear()
+    get_admin_snapshot.clear()
+
+
+def _clear_settings_caches():
+    """Drop cached voting settings and time status after the schedule changes"""
+    get_voting_settings.clear()
+    get_voting_time_status.clear()
 
 
 # Student registration functions
 def register_student(register_number, name):
     """Register a new student with proper error handling"""
     try:
-        conn = sqlite3.connect('voting_system.db')
-        cursor = conn.cursor()
-
         # Clean the inputs
         register_number = register_number.strip().upper()
         name = name.strip().title()
 
         # Try to insert - this will fail if register_number already exists
-        cursor.execute('INSERT INTO students (register_number, name) VALUES (?, ?)',
-                       (register_number, name))
-        conn.commit()
-        conn.close()
+        with write_transaction() as conn:
+            conn.execute('INSERT INTO students (register_number, name) VALUES (?, ?)',
+                         (register_number, name))
+        _clear_student_caches()
         return True, "Registration successful!"
     except sqlite3.IntegrityError as e:
-        conn.close()
         return False, "This register number is already registered!"
     except Exception as e:
-        if conn:
-            conn.close()
         return False, f"Registration failed: {str(e)}"
 
 
+def register_students_bulk(rows):
+    """Register many (register_number, name) rows in one transaction, skipping duplicates"""
+    try:
+        rows = [(register_number.strip().upper(), name.strip().title()) for register_number, name in rows]
+
+        with write_transaction() as conn:
+            changes_before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO students (register_number, name) VALUES (?, ?)', rows)
+            added = conn.total_changes - changes_before
+        _clear_student_caches()
+        return True, f"{added} students registered, {len(rows) - added} already registered."
+    except Exception as e:
+        return False, f"Bulk registration failed: {str(e)}"
+
+
 def is_student_registered(register_number):
     """Check if student is already registered"""
-    conn = sqlite3.connect('voting_system.db')
+    conn = get_read_conn()
     cursor = conn.cursor()
     cursor.execute('SELECT register_number FROM students WHERE register_number = ?', (register_number.strip().upper(),))
     result = cursor.fetchone()
-    conn.close()
     return result is not None
 
 
 def has_student_voted(register_number):
     """Check if student has already voted"""
-    conn = sqlite3.connect('voting_system.db')
+    conn = get_read_conn()
     cursor = conn.cursor()
     cursor.execute('SELECT register_number FROM votes WHERE register_number = ?', (register_number.strip().upper(),))
     result = cursor.fetchone()
-    conn.close()
     return result is not None
 
 
-def cast_vote(register_number, candidate):
-    """Cast a vote for a candidate"""
+def try_cast_vote(register_number, candidate):
+    """Cast a vote in one atomic statement; returns 'ok', 'not_registered', 'already_voted' or None on error"""
     try:
-        conn = sqlite3.connect('voting_system.db')
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO votes (register_number, candidate) VALUES (?, ?)',
-                       (register_number.strip().upper(), candidate))
-        conn.commit()
-        conn.close()
-        return True
+        register_number = register_number.strip().upper()
+
+        # Insert only if the student exists and has not voted yet
+        with write_transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO votes (register_number, candidate)
+                SELECT ?, ?
+                WHERE EXISTS (SELECT 1 FROM students WHERE register_number = ?)
+                  AND NOT EXISTS (SELECT 1 FROM votes WHERE register_number = ?)
+            ''', (register_number, candidate, register_number, register_number))
+        if cursor.rowcount == 1:
+            _clear_vote_caches()
+            return 'ok'
+
+        # Nothing inserted - find out why
+        cursor = get_read_conn().cursor()
+        cursor.execute('''
+            SELECT EXISTS (SELECT 1 FROM students WHERE register_number = ?),
+                   EXISTS (SELECT 1 FROM votes WHERE register_number = ?)
+        ''', (register_number, register_number))
+        registered, voted = cursor.fetchone()
+        if not registered:
+            return 'not_registered'
+        if voted:
+            return 'already_voted'
+        return None
+    except sqlite3.IntegrityError:
+        return 'already_voted'
     except:
-        return False
+        return None
 
 
-def get_all_students():
-    """Get all registered students"""
-    conn = sqlite3.connect('voting_system.db')
-    df = pd.read_sql_query(
-        'SELECT register_number, name, registration_time FROM students ORDER BY registration_time DESC', conn)
-    conn.close()
+def get_students_page(offset=0, limit=50):
+    """Get one page of registered students with a boolean voted flag, newest first"""
+    conn = get_read_conn()
+    query = '''
+        SELECT s.register_number, s.name, s.registration_time,
+               v.register_number IS NOT NULL AS voted
+        FROM students s
+        LEFT JOIN votes v ON v.register_number = s.register_number
+        ORDER BY s.registration_time DESC, s.register_number
+        LIMIT ? OFFSET ?
+    '''
+    df = pd.read_sql_query(query, conn, params=(limit, offset))
+    df['voted'] = df['voted'].astype(bool)
     return df
 
 
 def delete_all_students():
     """Delete all students and their votes"""
     try:
-        conn = sqlite3.connect('voting_system.db')
-        cursor = conn.cursor()
-        # Delete votes first (foreign key constraint)
-        cursor.execute('DELETE FROM votes')
-        # Then delete students
-        cursor.execute('DELETE FROM students')
-        conn.commit()
-        conn.close()
+        with write_transaction() as conn:
+            # Delete votes first (foreign key constraint)
+            conn.execute('DELETE FROM votes')
+            # Then delete students
+            conn.execute('DELETE FROM students')
+        _clear_vote_caches()
+        _clear_student_caches()
         return True, "All student records and votes deleted successfully!"
     except Exception as e:
         return False, f"Error deleting students: {str(e)}"
 
 
+@st.cache_data(ttl=2)
 def get_student_count():
     """Get total number of registered students"""
-    conn = sqlite3.connect('voting_system.db')
+    conn = get_read_conn()
     cursor = conn.cursor()
     cursor.execute('SELECT COUNT(*) FROM students')
     count = cursor.fetchone()[0]
-    conn.close()
     return count
 
 
+@st.cache_data(ttl=2)
 def get_vote_results():
     """Get voting results"""
-    conn = sqlite3.connect('voting_system.db')
+    conn = get_read_conn()
     cursor = conn.cursor()
     cursor.execute('''
-        SELECT candidate, COUNT(*) as votes 
-        FROM votes 
-        GROUP BY candidate
+        SELECT COALESCE(SUM(CASE WHEN candidate = 'Messi' THEN n END), 0),
+               COALESCE(SUM(CASE WHEN candidate = 'Ronaldo' THEN n END), 0)
+        FROM vote_tally
     ''')
-    results = cursor.fetchall()
-    conn.close()
-
-    # Convert to dictionary for easier handling
-    vote_dict = {'Messi': 0, 'Ronaldo': 0}
-    for candidate, votes in results:
-        vote_dict[candidate] = votes
+    messi, ronaldo = cursor.fetchone()
 
-    return vote_dict
+    return {'Messi': messi, 'Ronaldo': ronaldo}
 
 
+@st.cache_data(ttl=2)
 def get_total_votes():
     """Get total number of votes cast"""
-    conn = sqlite3.connect('voting_system.db')
+    conn = get_read_conn()
     cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) FROM votes')
+    cursor.execute('SELECT COALESCE(SUM(n), 0) FROM vote_tally')
     total = cursor.fetchone()[0]
-    conn.close()
     return total
 
 
+@st.cache_data(ttl=2)
+def get_admin_snapshot():
+    """Get per-candidate votes, total votes and student count in one query"""
+    conn = get_read_conn()
+    cursor = conn.cursor()
+    cursor.execute('''
+        WITH v AS (SELECT candidate, n FROM vote_tally),
+             s AS (SELECT COUNT(*) AS students FROM students)
+        SELECT COALESCE(SUM(CASE WHEN candidate = 'Messi' THEN n END), 0),
+               COALESCE(SUM(CASE WHEN candidate = 'Ronaldo' THEN n END), 0),
+               COALESCE(SUM(n), 0),
+               (SELECT students FROM s)
+        FROM v
+    ''')
+    messi, ronaldo, total, students = cursor.fetchone()
+    return {'messi': messi, 'ronaldo': ronaldo, 'total': total, 'students': students}
+
+
 # Voting time management functions (updated for India timezone)
 def set_voting_time(start_time, end_time, auto_declare=True):
     """Set voting start and end time in India timezone"""
     try:
-        conn = sqlite3.connect('voting_system.db')
-        cursor = conn.cursor()
-
         # Ensure times are in India timezone
         if start_time and not isinstance(start_time, str):
             if start_time.tzinfo is None:
-                start_time = INDIA_TZ.localize(start_time)
+                start_time = start_time.replace(tzinfo=INDIA_TZ)
             else:
                 start_time = start_time.astimezone(INDIA_TZ)
             start_time = start_time.isoformat()
 
         if end_time and not isinstance(end_time, str):
             if end_time.tzinfo is None:
-                end_time = INDIA_TZ.localize(end_time)
+                end_time = end_time.replace(tzinfo=INDIA_TZ)
             else:
                 end_time = end_time.astimezone(INDIA_TZ)
             end_time = end_time.isoformat()
 
-        # Delete existing settings
-        cursor.execute('DELETE FROM voting_settings')
+        with write_transaction() as conn:
+            # Insert or replace the single settings row in one statement
+            conn.execute('''
+                INSERT INTO voting_settings (id, voting_start_time, voting_end_time, auto_declare_winner,
+                                             voting_enabled, updated_at)
+                VALUES (1, ?, ?, ?, 1, CURRENT_TIMESTAMP)
+                ON CONFLICT(id) DO UPDATE SET
+                    voting_start_time = excluded.voting_start_time,
+                    voting_end_time = excluded.voting_end_time,
+                    auto_declare_winner = excluded.auto_declare_winner,
+                    voting_enabled = 1,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', (start_time, end_time, auto_declare))
+        _clear_settings_caches()
+        return True
+    except Exception as e:
+        print(f"Error setting voting time: {e}")
+        return False
+
+
+def _parse_india_time(value):
+    """Parse a stored ISO timestamp into a timezone-aware datetime"""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=INDIA_TZ)
+    return dt
 
-        # Insert new settings
-        cursor.execute('''
-            INSERT INTO voting_settings (voting_start_time, voting_end_time, auto_declare_winner, voting_enabled)
-            VALUES (?, ?, ?, 1)
-        ''', (start_time, end_time, auto_declare))
 
-        conn.commit()
-        conn.close()
+def clear_voting_schedule():
+    """Remove the voting schedule and settings"""
+    try:
+        with write_transaction() as conn:
+            conn.execute('DELETE FROM voting_settings')
+        _clear_settings_caches()
         return True
     except Exception as e:
-        print(f"Error setting voting time: {e}")
+        print(f"Error clearing voting schedule: {e}")
         return False
 
 
+def apply_settings(updates):
+    """Apply several voting_settings column updates (e.g. {'voting_enabled': 0}) in one transaction"""
+    try:
+        unknown = set(updates) - {'voting_enabled', 'auto_declare_winner'}
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+
+        assignments = ', '.join(f"{column} = ?" for column in updates)
+        with write_transaction() as conn:
+            conn.execute(f'UPDATE voting_settings SET {assignments}, updated_at = CURRENT_TIMESTAMP',
+                         tuple(updates.values()))
+        _clear_settings_caches()
+        return True
+    except Exception as e:
+        print(f"Error updating voting settings: {e}")
+        return False
+
+
+@st.cache_data(ttl=30)
 def get_voting_settings():
-    """Get current voting settings"""
-    conn = sqlite3.connect('voting_system.db')
+    """Get current voting settings with start/end times already parsed"""
+    conn = get_read_conn()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM voting_settings ORDER BY id DESC LIMIT 1')
+    cursor.execute('SELECT * FROM voting_settings WHERE id = 1')
     result = cursor.fetchone()
-    conn.close()
 
     if result:
+        start_time = _parse_india_time(result[1])
+        end_time = _parse_india_time(result[2])
         return {
             'id': result[0],
-            'start_time': result[1],
-            'end_time': result[2],
+            'start_time': start_time,
+            'end_time': end_time,
+            'start_epoch': start_time.timestamp() if start_time else None,
+            'end_epoch': end_time.timestamp() if end_time else None,
             'voting_enabled': result[3],
             'auto_declare_winner': result[4],
             'created_at': result[5],
@@ -268,27 +510,16 @@ def is_voting_active():
     if not settings or not settings['voting_enabled']:
         return False
 
-    current_time = get_india_time()
-
     if settings['start_time'] and settings['end_time']:
-        start_time = datetime.fromisoformat(settings['start_time'])
-        end_time = datetime.fromisoformat(settings['end_time'])
-
-        # Ensure timezone awareness
-        if start_time.tzinfo is None:
-            start_time = INDIA_TZ.localize(start_time)
-        if end_time.tzinfo is None:
-            end_time = INDIA_TZ.localize(end_time)
-
-        return start_time <= current_time <= end_time
+        return settings['start_epoch'] <= time.time() <= settings['end_epoch']
 
     return settings['voting_enabled']
 
 
+@st.cache_data(ttl=1)
 def get_voting_time_status():
     """Get detailed voting time status"""
     settings = get_voting_settings()
-    current_time = get_india_time()
 
     if not settings:
         return {
@@ -314,16 +545,11 @@ def get_voting_time_status():
             'time_remaining': None
         }
 
-    start_time = datetime.fromisoformat(settings['start_time'])
-    end_time = datetime.fromisoformat(settings['end_time'])
-
-    # Ensure timezone awareness
-    if start_time.tzinfo is None:
-        start_time = INDIA_TZ.localize(start_time)
-    if end_time.tzinfo is None:
-        end_time = INDIA_TZ.localize(end_time)
+    start_time = settings['start_time']
+    end_time = settings['end_time']
+    now = time.time()
 
-    if current_time < start_time:
+    if now < settings['start_epoch']:
         return {
             'status': 'not_started',
             'message': f'Voting will start at {start_time.strftime("%Y-%m-%d %H:%M:%S IST")}',
@@ -331,7 +557,7 @@ def get_voting_time_status():
             'time_remaining': None,
             'start_time': start_time
         }
-    elif current_time > end_time:
+    elif now > settings['end_epoch']:
         return {
             'status': 'ended',
             'message': f'Voting ended at {end_time.strftime("%Y-%m-%d %H:%M:%S IST")}',
@@ -340,7 +566,7 @@ def get_voting_time_status():
             'end_time': end_time
         }
     else:
-        time_remaining = end_time - current_time
+        time_remaining = timedelta(seconds=settings['end_epoch'] - now)
         return {
             'status': 'active',
             'message': f'Voting is active until {end_time.strftime("%Y-%m-%d %H:%M:%S IST")}',
@@ -350,8 +576,28 @@ def get_voting_time_status():
         }
 
 
+def _load_end_epoch():
+    """Get the scheduled voting end time as epoch seconds, or None if no end is set"""
+    settings = get_voting_settings()
+    if not settings:
+        return None
+    return settings['end_epoch']
+
+
 def auto_declare_winner_if_time_ended():
     """Automatically declare winner if voting time has ended"""
+    if st.session_state.get('winner_declared') or st.session_state.get('auto_declaration_processed'):
+        return False
+
+    # Skip the database until the end time (re-read at the settings TTL) has passed
+    now = time.time()
+    if now - st.session_state.get('_end_epoch_loaded_at', 0) > 30:
+        st.session_state._end_epoch = _load_end_epoch()
+        st.session_state._end_epoch_loaded_at = now
+    end_epoch = st.session_state._end_epoch
+    if end_epoch is None or now < end_epoch:
+        return False
+
     settings = get_voting_settings()
     if not settings or not settings['auto_declare_winner']:
         return False
@@ -385,22 +631,42 @@ def auto_declare_winner_if_time_ended():
 
 def format_time_remaining(time_delta):
     """Format time remaining in a readable format"""
-    if time_delta.days > 0:
-        return f"{time_delta.days} days, {time_delta.seconds // 3600} hours, {(time_delta.seconds % 3600) // 60} minutes"
-    elif time_delta.seconds >= 3600:
-        hours = time_delta.seconds // 3600
-        minutes = (time_delta.seconds % 3600) // 60
-        return f"{hours} hours, {minutes} minutes"
-    elif time_delta.seconds >= 60:
-        minutes = time_delta.seconds // 60
-        seconds = time_delta.seconds % 60
-        return f"{minutes} minutes, {seconds} seconds"
-    else:
-        return f"{time_delta.seconds} seconds"
+    total = int(time_delta.total_seconds())
+    days, rem = divmod(total, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes, seconds = divmod(rem, 60)
+    parts = [(days, 'days'), (hours, 'hours'), (minutes, 'minutes'), (seconds, 'seconds')]
+    return ', '.join(f"{value} {unit}" for value, unit in parts if value) or "0 seconds"
+
+
+# Placeholder card shown when a candidate image is missing
+PLACEHOLDER_GRADIENTS = {
+    'messi': 'linear-gradient(45deg, #1f77b4, #4CAF50)',
+    'ronaldo': 'linear-gradient(45deg, #ff7f0e, #FF5722)'
+}
+
+PLACEHOLDER_HTML = """
+            <div style="
+                width: {width}px; 
+                height: {height}px; 
+                background: {gradient};
+                display: flex; 
+                align-items: center; 
+                justify-content: center; 
+                color: white; 
+                font-size: 18px; 
+                font-weight: bold;
+                border-radius: 10px;
+                margin: 10px 0;
+            ">
+                {caption}
+            </div>
+            """
 
 
+@st.cache_resource
 def load_candidate_image(candidate_name):
-    """Load candidate image from local files"""
+    """Load candidate image from local files (decoded once per process)"""
     # Define image paths
     image_paths = {
         'messi': ['images/messi.jpg', 'images/messi.jpeg', 'images/messi.png', 'messi.jpg', 'messi.jpeg', 'messi.png'],
@@ -415,6 +681,7 @@ def load_candidate_image(candidate_name):
             if os.path.exists(path):
                 try:
                     image = Image.open(path)
+                    image.load()
                     return image
                 except Exception as e:
                     continue
@@ -431,47 +698,15 @@ def display_candidate_image(candidate_name, caption, width=200):
         st.image(image, caption=caption, width=width)
     else:
         # Fallback to a colored placeholder
-        if candidate_name.lower() == 'messi':
-            st.markdown(f"""
-            <div style="
-                width: {width}px; 
-                height: {int(width * 1.2)}px; 
-                background: linear-gradient(45deg, #1f77b4, #4CAF50);
-                display: flex; 
-                align-items: center; 
-                justify-content: center; 
-                color: white; 
-                font-size: 18px; 
-                font-weight: bold;
-                border-radius: 10px;
-                margin: 10px 0;
-            ">
-                {caption}
-            </div>
-            """, unsafe_allow_html=True)
-        else:  # Ronaldo
-            st.markdown(f"""
-            <div style="
-                width: {width}px; 
-                height: {int(width * 1.2)}px; 
-                background: linear-gradient(45deg, #ff7f0e, #FF5722);
-                display: flex; 
-                align-items: center; 
-                justify-content: center; 
-                color: white; 
-                font-size: 18px; 
-                font-weight: bold;
-                border-radius: 10px;
-                margin: 10px 0;
-            ">
-                {caption}
-            </div>
-            """, unsafe_allow_html=True)
+        gradient = PLACEHOLDER_GRADIENTS['messi' if candidate_name.lower() == 'messi' else 'ronaldo']
+        st.markdown(PLACEHOLDER_HTML.format(width=width, height=int(width * 1.2), gradient=gradient, caption=caption),
+                    unsafe_allow_html=True)
 
 
-def get_students_who_voted():
-    """Get detailed information about students who have voted"""
-    conn = sqlite3.connect('voting_system.db')
+@st.cache_data(ttl=5)
+def get_students_who_voted(db_version=None):
+    """Get detailed information about students who have voted (db_version keys the cache)"""
+    conn = get_read_conn()
     query = '''
         SELECT s.register_number, s.name, v.candidate, v.vote_time
         FROM students s
@@ -479,18 +714,33 @@ def get_students_who_voted():
         ORDER BY v.vote_time DESC
     '''
     df = pd.read_sql_query(query, conn)
-    conn.close()
+
+    # Convert the stored UTC timestamps to India time for the whole column at once
+    df['vote_time'] = (pd.to_datetime(df['vote_time'], utc=True)
+                       .dt.tz_convert(INDIA_TZ.key)
+                       .dt.strftime('%Y-%m-%d %H:%M:%S IST'))
     return df
 
 
+@st.cache_data(max_entries=1)
+def build_votes_csv(db_version):
+    """Serialize the voted-students table to CSV bytes once per write version"""
+    return get_students_who_voted(db_version).to_csv(index=False).encode()
+
+
+@st.cache_data(ttl=5)
+def get_voted_count(db_version=None):
+    """Get the number of distinct students who have voted (db_version keys the cache)"""
+    cursor = get_read_conn().execute('SELECT COUNT(DISTINCT register_number) FROM votes')
+    return cursor.fetchone()[0]
+
+
 def reset_election():
     """Reset the entire election - clear all votes and winner declarations"""
     try:
-        conn = sqlite3.connect('voting_system.db')
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM votes')
-        conn.commit()
-        conn.close()
+        with write_transaction() as conn:
+            conn.execute('DELETE FROM votes')
+        _clear_vote_caches()
         return True
     except:
         return False
@@ -499,6 +749,8 @@ def reset_election():
 # Initialize session state
 def init_session_state():
     """Initialize session state variables"""
+    _bootstrap()
+
     if 'page' not in st.session_state:
         st.session_state.page = 'home'
     if 'admin_logged_in' not in st.session_state:
@@ -513,6 +765,10 @@ def init_session_state():
         st.session_state.declared_winner = None
     if 'registration_success' not in st.session_state:
         st.session_state.registration_success = False
+    if 'bulk_import_message' not in st.session_state:
+        st.session_state.bulk_import_message = None
+    if 'voted_for' not in st.session_state:
+        st.session_state.voted_for = None
     if 'auto_declared' not in st.session_state:
         st.session_state.auto_declared = False
     if 'auto_declaration_processed' not in st.session_state:
@@ -535,6 +791,10 @@ def show_home_page():
     # Check and display voting status
     time_status = get_voting_time_status()
 
+    # Refresh the page every 5 seconds while voting is active
+    if time_status['status'] == 'active':
+        st_autorefresh(interval=5000, key="vote_refresh")
+
     # Display voting status banner
     if time_status['status'] == 'not_started':
         st.info(f"⏰ {time_status['message']}")
@@ -604,11 +864,6 @@ def show_home_page():
             with col3:
                 st.metric("Total Votes", total)
 
-    # Auto-refresh page every 30 seconds when voting is active
-    if time_status['status'] == 'active' and time_status['time_remaining']:
-        time.sleep(1)  # Small delay for smoother updates
-        st.rerun()
-
 
 def show_signup_page():
     """Display student registration page"""
@@ -676,6 +931,10 @@ def show_voting_page():
     # Check voting time status
     time_status = get_voting_time_status()
 
+    # Refresh the page every 5 seconds while voting is active
+    if time_status['status'] == 'active':
+        st_autorefresh(interval=5000, key="vote_refresh")
+
     # Display voting status
     if time_status['status'] == 'not_started':
         st.warning(f"⏰ {time_status['message']}")
@@ -714,6 +973,11 @@ def show_voting_page():
 
     # Check if student has already voted
     if has_student_voted(st.session_state.current_student):
+        # Celebrate a vote cast on the previous run, once
+        if st.session_state.voted_for:
+            st.success(f"🎉 Thank you for voting for {st.session_state.voted_for}!")
+            st.balloons()
+            st.session_state.voted_for = None
         st.success("✅ You have already cast your vote!")
         st.info("Thank you for participating in the voting!")
 
@@ -740,20 +1004,26 @@ def show_voting_page():
             ronaldo_vote = st.button("⚽ Vote for Ronaldo", use_container_width=True, type="primary")
 
         if messi_vote:
-            if cast_vote(st.session_state.current_student, "Messi"):
-                st.success("🎉 Thank you for voting for Messi!")
-                st.balloons()
-                time.sleep(2)
+            vote_status = try_cast_vote(st.session_state.current_student, "Messi")
+            if vote_status == 'ok':
+                st.session_state.voted_for = "Messi"
                 st.rerun()
+            elif vote_status == 'already_voted':
+                st.error("You have already voted!")
+            elif vote_status == 'not_registered':
+                st.error("Register number not found. Please register first!")
             else:
                 st.error("Voting failed. Please try again.")
 
         if ronaldo_vote:
-            if cast_vote(st.session_state.current_student, "Ronaldo"):
-                st.success("🎉 Thank you for voting for Ronaldo!")
-                st.balloons()
-                time.sleep(2)
+            vote_status = try_cast_vote(st.session_state.current_student, "Ronaldo")
+            if vote_status == 'ok':
+                st.session_state.voted_for = "Ronaldo"
                 st.rerun()
+            elif vote_status == 'already_voted':
+                st.error("You have already voted!")
+            elif vote_status == 'not_registered':
+                st.error("Register number not found. Please register first!")
             else:
                 st.error("Voting failed. Please try again.")
     else:
@@ -785,438 +1055,507 @@ def show_admin_login():
                 st.error("Invalid credentials!")
 
 
-def show_admin_panel():
-    """Display admin panel with all administrative functions"""
-    if not st.session_state.admin_logged_in:
-        st.session_state.page = 'admin_login'
-        st.rerun()
-        return
+def _results_df(messi_votes, ronaldo_votes):
+    """Build the results DataFrame used by the admin charts"""
+    return pd.DataFrame([
+        {'Candidate': 'Messi', 'Votes': messi_votes},
+        {'Candidate': 'Ronaldo', 'Votes': ronaldo_votes}
+    ])
 
-    st.title("👨‍💼 Admin Panel")
 
-    # Display current India time
-    current_time = get_india_time()
-    st.info(f"🕐 Current Time (India): {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
+@st.cache_data(max_entries=4)
+def _bar_fig(messi_votes, ronaldo_votes):
+    """Build the vote distribution bar chart (cached per vote count pair)"""
+    return px.bar(_results_df(messi_votes, ronaldo_votes), x='Candidate', y='Votes',
+                  title="Vote Distribution",
+                  color='Candidate',
+                  color_discrete_map={'Messi': '#1f77b4', 'Ronaldo': '#ff7f0e'})
 
-    col1, col2 = st.columns([6, 1])
-    with col2:
-        if st.button("Logout"):
-            st.session_state.admin_logged_in = False
-            st.session_state.page = 'home'
-            st.rerun()
 
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
-        ["📊 Voting Results", "👥 Student Data", "✅ Voted Students", "🏆 Declare Winner", "🔄 Re-Election",
-         "⏰ Time Settings"])
+@st.cache_data(max_entries=4)
+def _pie_fig(messi_votes, ronaldo_votes):
+    """Build the vote percentage pie chart (cached per vote count pair)"""
+    return px.pie(_results_df(messi_votes, ronaldo_votes), values='Votes', names='Candidate',
+                  title="Vote Percentage",
+                  color_discrete_map={'Messi': '#1f77b4', 'Ronaldo': '#ff7f0e'})
 
-    with tab1:
-        st.subheader("📊 Voting Results")
 
-        results = get_vote_results()
-        total_votes = sum(results.values())
+@st.fragment
+def _results_tab():
+    """Render the Voting Results admin tab (reruns on its own)"""
+    st.subheader("📊 Voting Results")
 
-        if total_votes > 0:
-            # Display metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Votes", total_votes)
-            with col2:
-                st.metric("Messi", results['Messi'],
-                          f"{(results['Messi'] / total_votes * 100):.1f}%")
-            with col3:
-                st.metric("Ronaldo", results['Ronaldo'],
-                          f"{(results['Ronaldo'] / total_votes * 100):.1f}%")
+    snapshot = get_admin_snapshot()
+    results = {'Messi': snapshot['messi'], 'Ronaldo': snapshot['ronaldo']}
+    total_votes = snapshot['total']
 
-            # Create visualization
-            df_results = pd.DataFrame([
-                {'Candidate': 'Messi', 'Votes': results['Messi']},
-                {'Candidate': 'Ronaldo', 'Votes': results['Ronaldo']}
-            ])
+    if total_votes > 0:
+        # Display metrics
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Votes", total_votes)
+        with col2:
+            st.metric("Messi", results['Messi'],
+                      f"{(results['Messi'] / total_votes * 100):.1f}%")
+        with col3:
+            st.metric("Ronaldo", results['Ronaldo'],
+                      f"{(results['Ronaldo'] / total_votes * 100):.1f}%")
+        with col4:
+            st.metric("Registered Students", snapshot['students'])
 
-            col1, col2 = st.columns(2)
+        # Create visualization
+        col1, col2 = st.columns(2)
 
-            with col1:
-                fig_bar = px.bar(df_results, x='Candidate', y='Votes',
-                                 title="Vote Distribution",
-                                 color='Candidate',
-                                 color_discrete_map={'Messi': '#1f77b4', 'Ronaldo': '#ff7f0e'})
-                st.plotly_chart(fig_bar, use_container_width=True)
+        with col1:
+            st.plotly_chart(_bar_fig(results['Messi'], results['Ronaldo']), use_container_width=True)
 
-            with col2:
-                fig_pie = px.pie(df_results, values='Votes', names='Candidate',
-                                 title="Vote Percentage",
-                                 color_discrete_map={'Messi': '#1f77b4', 'Ronaldo': '#ff7f0e'})
-                st.plotly_chart(fig_pie, use_container_width=True)
-        else:
-            st.info("No votes cast yet.")
+        with col2:
+            st.plotly_chart(_pie_fig(results['Messi'], results['Ronaldo']), use_container_width=True)
+    else:
+        st.info("No votes cast yet.")
 
-    with tab2:
-        st.subheader("👥 All Registered Students")
 
-        students_df = get_all_students()
+@st.fragment
+def _students_tab():
+    """Render the Student Data admin tab (reruns on its own)"""
+    st.subheader("👥 All Registered Students")
 
-        if not students_df.empty:
-            st.dataframe(students_df, use_container_width=True)
-            st.info(f"Total registered students: {len(students_df)}")
+    student_count = get_student_count()
 
-            # Show voting status
-            conn = sqlite3.connect('voting_system.db')
-            cursor = conn.cursor()
-            cursor.execute('SELECT DISTINCT register_number FROM votes')
-            voted = [row[0] for row in cursor.fetchall()]
-            conn.close()
+    if student_count > 0:
+        # Show the roster one page at a time
+        page_size = 50
+        page_count = (student_count - 1) // page_size + 1
+        # Fixed label and key (no max_value) so a changing page count keeps the selected page
+        if st.session_state.get('roster_page', 1) > page_count:
+            st.session_state.roster_page = page_count
+        page = st.number_input("Page", min_value=1, value=1, step=1, key='roster_page')
+        st.caption(f"Page {page} of {page_count}")
+
+        # One table with the voting status merged in, so student rows are only sent once
+        page_df = get_students_page((page - 1) * page_size, page_size)
+        page_df['Voting_Status'] = np.where(page_df['voted'], '✅ Voted', '❌ Not Voted')
+        st.dataframe(page_df[['register_number', 'name', 'registration_time', 'Voting_Status']],
+                     use_container_width=True)
+        st.info(f"Total registered students: {student_count}")
+
+        # Summary statistics
+        st.subheader("📊 Voting Status Overview")
+        total_students = student_count
+        voted_count = get_voted_count(_db_version())
+        not_voted_count = total_students - voted_count
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Students", total_students)
+        with col2:
+            st.metric("Voted", voted_count, f"{(voted_count / total_students * 100):.1f}%")
+        with col3:
+            st.metric("Not Voted", not_voted_count, f"{(not_voted_count / total_students * 100):.1f}%")
 
-            students_df['Voting_Status'] = students_df['register_number'].apply(
-                lambda x: '✅ Voted' if x in voted else '❌ Not Voted')
-            st.subheader("📊 Voting Status Overview")
-            st.dataframe(students_df[['register_number', 'name', 'Voting_Status']], use_container_width=True)
+        # Delete all students button
+        st.markdown("---")
+        st.subheader("🗑️ Student Database Management")
+        st.warning("⚠️ **CAUTION**: This will permanently delete ALL student records and their votes!")
 
-            # Summary statistics
-            voted_count = len(voted)
-            not_voted_count = len(students_df) - voted_count
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Students", len(students_df))
-            with col2:
-                st.metric("Voted", voted_count, f"{(voted_count / len(students_df) * 100):.1f}%")
-            with col3:
-                st.metric("Not Voted", not_voted_count, f"{(not_voted_count / len(students_df) * 100):.1f}%")
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            if st.button("🗑️ Delete All Students", type="secondary", use_container_width=True):
+                success, message = delete_all_students()
+                if success:
+                    st.success(message)
+                    # Reset session state
+                    st.session_state.winner_declared = False
+                    st.session_state.declared_winner = None
+                    st.session_state.auto_declared = False
+                    st.session_state.auto_declaration_processed = False
+                    st.rerun()
+                else:
+                    st.error(message)
+        with col2:
+            st.info("This will remove all student registrations and votes. Use with caution!")
+    else:
+        st.info("No students registered yet.")
 
-            # Delete all students button
-            st.markdown("---")
-            st.subheader("🗑️ Student Database Management")
-            st.warning("⚠️ **CAUTION**: This will permanently delete ALL student records and their votes!")
+    # Bulk student import
+    st.markdown("---")
+    st.subheader("📥 Bulk Import Students")
+
+    # Show the result of the last import, which was stored before the rerun
+    if st.session_state.bulk_import_message:
+        st.success(st.session_state.bulk_import_message)
+        st.session_state.bulk_import_message = None
+
+    with st.form("bulk_import_form"):
+        bulk_text = st.text_area("One student per line as: Register Number, Full Name",
+                                 placeholder="2021CS001, John Doe\n2021CS002, Jane Smith")
+        import_button = st.form_submit_button("📥 Import Students")
+
+        if import_button:
+            rows = []
+            invalid_lines = []
+            for line in bulk_text.splitlines():
+                if not line.strip():
+                    continue
+                register_number, _, name = line.partition(',')
+                if len(register_number.strip()) < 3 or len(name.strip()) < 2:
+                    invalid_lines.append(line)
+                else:
+                    rows.append((register_number, name))
 
-            col1, col2 = st.columns([1, 3])
-            with col1:
-                if st.button("🗑️ Delete All Students", type="secondary", use_container_width=True):
-                    success, message = delete_all_students()
-                    if success:
-                        st.success(message)
-                        # Reset session state
-                        st.session_state.winner_declared = False
-                        st.session_state.declared_winner = None
-                        st.session_state.auto_declared = False
-                        st.session_state.auto_declaration_processed = False
-                        st.rerun()
-                    else:
-                        st.error(message)
-            with col2:
-                st.info("This will remove all student registrations and votes. Use with caution!")
-        else:
-            st.info("No students registered yet.")
+            if invalid_lines:
+                st.error(f"Invalid lines (fix and retry): {', '.join(invalid_lines)}")
+            elif not rows:
+                st.error("Please enter at least one student!")
+            else:
+                success, message = register_students_bulk(rows)
+                if success:
+                    st.session_state.bulk_import_message = message
+                    st.rerun()
+                else:
+                    st.error(message)
 
-    with tab3:
-        st.subheader("✅ Students Who Have Voted")
-
-        voted_students_df = get_students_who_voted()
-
-        if not voted_students_df.empty:
-            st.dataframe(voted_students_df, use_container_width=True)
-
-            # Summary by candidate
-            st.subheader("📊 Votes Summary by Candidate")
-            candidate_summary = voted_students_df.groupby('candidate').size().reset_index(name='count')
-            col1, col2 = st.columns(2)
-
-            for idx, row in candidate_summary.iterrows():
-                with col1 if idx == 0 else col2:
-                    st.metric(f"{row['candidate']} Voters", row['count'])
-
-            # Show recent votes
-            st.subheader("🕒 Recent Votes")
-            recent_votes = voted_students_df.head(10)
-            st.dataframe(recent_votes, use_container_width=True)
-
-            # Export functionality
-            if st.button("💾 Download Voting Data as CSV"):
-                csv = voted_students_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=csv,
-                    file_name=f"voting_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+
+@st.fragment
+def _voted_students_tab():
+    """Render the Voted Students admin tab (reruns on its own)"""
+    st.subheader("✅ Students Who Have Voted")
+
+    # Rebuild the voter table and its summary only after a write
+    votes_version = _db_version()
+    if st.session_state.get('_voted_df_ver') != votes_version:
+        st.session_state._voted_df = get_students_who_voted(votes_version)
+        st.session_state._candidate_counts = st.session_state._voted_df['candidate'].value_counts().to_dict()
+        st.session_state._voted_df_ver = votes_version
+    voted_students_df = st.session_state._voted_df
+
+    if not voted_students_df.empty:
+        st.dataframe(voted_students_df, use_container_width=True)
+
+        # Summary by candidate
+        st.subheader("📊 Votes Summary by Candidate")
+        counts = st.session_state._candidate_counts
+        cols = st.columns(len(counts))
+
+        for col, (candidate, count) in zip(cols, counts.items()):
+            col.metric(f"{candidate} Voters", count)
+
+        # Show recent votes
+        st.subheader("🕒 Recent Votes")
+        recent_votes = voted_students_df.head(10)
+        st.dataframe(recent_votes, use_container_width=True)
+
+        # Export functionality
+        st.download_button(
+            label="📥 Download Voting Data as CSV",
+            data=build_votes_csv(votes_version),
+            file_name=f"voting_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv"
+        )
+    else:
+        st.info("No votes have been cast yet.")
+
+
+@st.fragment
+def _declare_winner_tab():
+    """Render the Declare Winner admin tab (reruns on its own)"""
+    st.subheader("🏆 Declare Winner")
+
+    snapshot = get_admin_snapshot()
+    results = {'Messi': snapshot['messi'], 'Ronaldo': snapshot['ronaldo']}
+    total_votes = snapshot['total']
+
+    if total_votes > 0:
+        if results['Messi'] > results['Ronaldo']:
+            leading = "Messi"
+        elif results['Ronaldo'] > results['Messi']:
+            leading = "Ronaldo"
         else:
-            st.info("No votes have been cast yet.")
+            leading = "Tie"
 
-    with tab4:
-        st.subheader("🏆 Declare Winner")
+        st.info(f"Current leader: **{leading}**")
 
-        results = get_vote_results()
-        total_votes = sum(results.values())
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("🏆 Declare Messi as Winner", use_container_width=True):
+                st.session_state.winner_declared = True
+                st.session_state.declared_winner = "Messi"
+                st.session_state.auto_declared = False
+                st.success("Messi declared as winner!")
+                st.rerun()
 
-        if total_votes > 0:
-            if results['Messi'] > results['Ronaldo']:
-                leading = "Messi"
-            elif results['Ronaldo'] > results['Messi']:
-                leading = "Ronaldo"
-            else:
-                leading = "Tie"
+        with col2:
+            if st.button("🏆 Declare Ronaldo as Winner", use_container_width=True):
+                st.session_state.winner_declared = True
+                st.session_state.declared_winner = "Ronaldo"
+                st.session_state.auto_declared = False
+                st.success("Ronaldo declared as winner!")
+                st.rerun()
 
-            st.info(f"Current leader: **{leading}**")
+        with col3:
+            if st.button("🤝 Declare Tie", use_container_width=True):
+                st.session_state.winner_declared = True
+                st.session_state.declared_winner = "Tie"
+                st.session_state.auto_declared = False
+                st.success("Tie declared!")
+                st.rerun()
 
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("🏆 Declare Messi as Winner", use_container_width=True):
-                    st.session_state.winner_declared = True
-                    st.session_state.declared_winner = "Messi"
-                    st.session_state.auto_declared = False
-                    st.success("Messi declared as winner!")
-                    st.rerun()
+        if st.session_state.winner_declared:
+            declaration_type = "🤖 Auto-declared" if st.session_state.get('auto_declared',
+                                                                         False) else "👨‍💼 Admin-declared"
+            st.success(f"🏆 {declaration_type} Winner: **{st.session_state.declared_winner}**")
+
+            if st.button("🔄 Reset Winner Declaration", type="secondary"):
+                st.session_state.winner_declared = False
+                st.session_state.declared_winner = None
+                st.session_state.auto_declared = False
+                st.session_state.auto_declaration_processed = False
+                st.info("Winner declaration reset.")
+                st.rerun()
+    else:
+        st.warning("No votes cast yet. Cannot declare winner.")
 
-            with col2:
-                if st.button("🏆 Declare Ronaldo as Winner", use_container_width=True):
-                    st.session_state.winner_declared = True
-                    st.session_state.declared_winner = "Ronaldo"
-                    st.session_state.auto_declared = False
-                    st.success("Ronaldo declared as winner!")
-                    st.rerun()
 
-            with col3:
-                if st.button("🤝 Declare Tie", use_container_width=True):
-                    st.session_state.winner_declared = True
-                    st.session_state.declared_winner = "Tie"
-                    st.session_state.auto_declared = False
-                    st.success("Tie declared!")
-                    st.rerun()
+@st.fragment
+def _re_election_tab():
+    """Render the Re-Election admin tab (reruns on its own)"""
+    st.subheader("🔄 Re-Election Management")
 
-            if st.session_state.winner_declared:
-                declaration_type = "🤖 Auto-declared" if st.session_state.get('auto_declared',
-                                                                             False) else "👨‍💼 Admin-declared"
-                st.success(f"🏆 {declaration_type} Winner: **{st.session_state.declared_winner}**")
+    st.warning("⚠️ **CAUTION**: This will permanently delete all voting data!")
 
-                if st.button("🔄 Reset Winner Declaration", type="secondary"):
-                    st.session_state.winner_declared = False
-                    st.session_state.declared_winner = None
-                    st.session_state.auto_declared = False
-                    st.session_state.auto_declaration_processed = False
-                    st.info("Winner declaration reset.")
-                    st.rerun()
-        else:
-            st.warning("No votes cast yet. Cannot declare winner.")
+    snapshot = get_admin_snapshot()
+    results = {'Messi': snapshot['messi'], 'Ronaldo': snapshot['ronaldo']}
+    total_votes = snapshot['total']
 
-    with tab5:
-        st.subheader("🔄 Re-Election Management")
+    if total_votes > 0:
+        st.info(f"Current election has {total_votes} votes cast.")
 
-        st.warning("⚠️ **CAUTION**: This will permanently delete all voting data!")
+        # Show current results before reset
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Messi", results['Messi'])
+        with col2:
+            st.metric("Ronaldo", results['Ronaldo'])
 
-        results = get_vote_results()
-        total_votes = sum(results.values())
+        st.markdown("---")
 
-        if total_votes > 0:
-            st.info(f"Current election has {total_votes} votes cast.")
+        # Confirmation checkboxes
+        confirm1 = st.checkbox("I understand this will delete all votes")
+        confirm2 = st.checkbox("I understand this action cannot be undone")
+        confirm3 = st.checkbox("I want to start a new election")
 
-            # Show current results before reset
-            col1, col2 = st.columns(2)
+        if confirm1 and confirm2 and confirm3:
+            col1, col2 = st.columns([1, 2])
             with col1:
-                st.metric("Messi", results['Messi'])
+                if st.button("🗑️ RESET ELECTION", type="primary", use_container_width=True):
+                    if reset_election():
+                        st.session_state.winner_declared = False
+                        st.session_state.declared_winner = None
+                        st.session_state.auto_declared = False
+                        st.session_state.auto_declaration_processed = False
+                        st.success("✅ Election reset successfully! All votes have been cleared.")
+                        st.balloons()
+                        st.rerun()
+                    else:
+                        st.error("❌ Failed to reset election. Please try again.")
+
             with col2:
-                st.metric("Ronaldo", results['Ronaldo'])
-
-            st.markdown("---")
-
-            # Confirmation checkboxes
-            confirm1 = st.checkbox("I understand this will delete all votes")
-            confirm2 = st.checkbox("I understand this action cannot be undone")
-            confirm3 = st.checkbox("I want to start a new election")
-
-            if confirm1 and confirm2 and confirm3:
-                col1, col2 = st.columns([1, 2])
-                with col1:
-                    if st.button("🗑️ RESET ELECTION", type="primary", use_container_width=True):
-                        if reset_election():
-                            st.session_state.winner_declared = False
-                            st.session_state.declared_winner = None
-                            st.session_state.auto_declared = False
-                            st.session_state.auto_declaration_processed = False
-                            st.success("✅ Election reset successfully! All votes have been cleared.")
-                            st.balloons()
-                            st.rerun()
-                        else:
-                            st.error("❌ Failed to reset election. Please try again.")
-
-                with col2:
-                    st.info("Click the button to start fresh election")
-            else:
-                st.info("Please confirm all checkboxes above to enable election reset.")
+                st.info("Click the button to start fresh election")
         else:
-            st.info("No votes have been cast yet. Nothing to reset.")
+            st.info("Please confirm all checkboxes above to enable election reset.")
+    else:
+        st.info("No votes have been cast yet. Nothing to reset.")
 
-            if st.session_state.winner_declared:
-                st.info("Winner declaration is active. You can reset it from the 'Declare Winner' tab.")
+        if st.session_state.winner_declared:
+            st.info("Winner declaration is active. You can reset it from the 'Declare Winner' tab.")
 
-    with tab6:
-        st.subheader("⏰ Voting Time Management (India Timezone)")
 
-        # Display current settings
-        current_settings = get_voting_settings()
-        time_status = get_voting_time_status()
+# Quick voting schedule presets: (button label, duration in minutes, name in the success message)
+PRESETS = [('⏰ 15 Minutes', 15, '15-minute'), ('🕧 30 Minutes', 30, '30-minute'),
+           ('🕘 45 Minutes', 45, '45-minute'), ('🕐 1 Hour', 60, '1-hour')]
 
-        # Current status display
-        st.markdown("### 📊 Current Status")
-        col1, col2, col3 = st.columns(3)
 
-        with col1:
-            status_color = {
-                'active': '🟢',
-                'not_started': '🟡',
-                'ended': '🔴',
-                'disabled': '⚫',
-                'no_schedule': '⚪'
-            }
-            st.metric("Voting Status",
-                      f"{status_color.get(time_status['status'], '⚪')} {time_status['status'].title().replace('_', ' ')}")
+def _apply_preset(start_time, minutes, name):
+    """Start a preset-length voting window now and rerun the app"""
+    if set_voting_time(start_time, start_time + timedelta(minutes=minutes), True):
+        st.session_state.auto_declaration_processed = False
+        st.success(f"✅ {name} voting set!")
+        st.rerun()
 
-        with col2:
-            if current_settings and current_settings['start_time']:
-                st.metric("Start Time", format_india_time(current_settings['start_time']))
-            else:
-                st.metric("Start Time", "Not Set")
 
-        with col3:
-            if current_settings and current_settings['end_time']:
-                st.metric("End Time", format_india_time(current_settings['end_time']))
-            else:
-                st.metric("End Time", "Not Set")
+@st.fragment
+def _time_settings_tab():
+    """Render the Time Settings admin tab (reruns on its own)"""
+    st.subheader("⏰ Voting Time Management (India Timezone)")
 
-        if time_status['status'] == 'active' and time_status['time_remaining']:
-            remaining = format_time_remaining(time_status['time_remaining'])
-            st.info(f"⏳ Time remaining: {remaining}")
+    # Get current India time once for the defaults, presets and validation below
+    india_now = get_india_time()
 
-        st.markdown("---")
+    # Display current settings
+    current_settings = get_voting_settings()
+    time_status = get_voting_time_status()
 
-        # Time setting form
-        st.markdown("### ⚙️ Set Voting Schedule")
+    # Current status display
+    st.markdown("### 📊 Current Status")
+    col1, col2, col3 = st.columns(3)
 
-        with st.form("time_settings_form"):
-            col1, col2 = st.columns(2)
+    with col1:
+        status_color = {
+            'active': '🟢',
+            'not_started': '🟡',
+            'ended': '🔴',
+            'disabled': '⚫',
+            'no_schedule': '⚪'
+        }
+        st.metric("Voting Status",
+                  f"{status_color.get(time_status['status'], '⚪')} {time_status['status'].title().replace('_', ' ')}")
 
-            # Get current India time
-            india_now = get_india_time()
+    # Format the schedule once for display
+    start_display = format_india_time(current_settings['start_time'] if current_settings else None)
+    end_display = format_india_time(current_settings['end_time'] if current_settings else None)
 
-            with col1:
-                start_date = st.date_input("Start Date", india_now.date())
-                start_time_input = st.time_input("Start Time", india_now.time())
+    with col2:
+        st.metric("Start Time", start_display)
 
-            with col2:
-                end_date = st.date_input("End Date", (india_now + timedelta(days=1)).date())
-                end_time_input = st.time_input("End Time", (india_now + timedelta(hours=1)).time())
+    with col3:
+        st.metric("End Time", end_display)
 
-            auto_declare = st.checkbox("Auto-declare winner when time ends", value=True)
+    if time_status['status'] == 'active' and time_status['time_remaining']:
+        remaining = format_time_remaining(time_status['time_remaining'])
+        st.info(f"⏳ Time remaining: {remaining}")
 
-            col1, col2, col3 = st.columns([1, 1, 2])
+    st.markdown("---")
 
-            with col1:
-                if st.form_submit_button("📅 Set Schedule", type="primary"):
-                    start_datetime = datetime.combine(start_date, start_time_input)
-                    end_datetime = datetime.combine(end_date, end_time_input)
-
-                    # Localize to India timezone
-                    start_datetime = INDIA_TZ.localize(start_datetime)
-                    end_datetime = INDIA_TZ.localize(end_datetime)
-
-                    if end_datetime <= start_datetime:
-                        st.error("End time must be after start time!")
-                    elif start_datetime < india_now:
-                        st.error("Start time cannot be in the past!")
-                    else:
-                        if set_voting_time(start_datetime, end_datetime, auto_declare):
-                            # Reset auto-declaration processed flag when new schedule is set
-                            st.session_state.auto_declaration_processed = False
-                            st.success("✅ Voting schedule updated successfully!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Failed to update schedule!")
+    # Time setting form
+    st.markdown("### ⚙️ Set Voting Schedule")
 
-            with col2:
-                if st.form_submit_button("🟢 Enable Now"):
-                    if set_voting_time(india_now, None, False):
-                        st.success("✅ Voting enabled!")
-                        st.rerun()
-                    else:
-                        st.error("❌ Failed to enable voting!")
+    with st.form("time_settings_form"):
+        col1, col2 = st.columns(2)
 
-            with col3:
-                if st.form_submit_button("🔴 Disable Voting"):
-                    conn = sqlite3.connect('voting_system.db')
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE voting_settings SET voting_enabled = 0')
-                    conn.commit()
-                    conn.close()
-                    st.success("✅ Voting disabled!")
-                    st.rerun()
+        with col1:
+            start_date = st.date_input("Start Date", india_now.date())
+            start_time_input = st.time_input("Start Time", india_now.time())
 
-        st.markdown("---")
+        with col2:
+            end_date = st.date_input("End Date", (india_now + timedelta(days=1)).date())
+            end_time_input = st.time_input("End Time", (india_now + timedelta(hours=1)).time())
 
-        # Updated Quick time presets (15, 30, 45 minutes - removed 1 week)
-        st.markdown("### ⚡ Quick Presets")
-        col1, col2, col3, col4 = st.columns(4)
+        auto_declare = st.checkbox("Auto-declare winner when time ends", value=True)
+
+        col1, col2, col3 = st.columns([1, 1, 2])
 
         with col1:
-            if st.button("⏰ 15 Minutes", use_container_width=True):
-                start_time = get_india_time()
-                end_time = start_time + timedelta(minutes=15)
-                if set_voting_time(start_time, end_time, True):
-                    st.session_state.auto_declaration_processed = False
-                    st.success("✅ 15-minute voting set!")
-                    st.rerun()
+            if st.form_submit_button("📅 Set Schedule", type="primary"):
+                start_datetime = datetime.combine(start_date, start_time_input)
+                end_datetime = datetime.combine(end_date, end_time_input)
+
+                # Localize to India timezone
+                start_datetime = start_datetime.replace(tzinfo=INDIA_TZ)
+                end_datetime = end_datetime.replace(tzinfo=INDIA_TZ)
+
+                if end_datetime <= start_datetime:
+                    st.error("End time must be after start time!")
+                elif start_datetime < india_now:
+                    st.error("Start time cannot be in the past!")
+                else:
+                    if set_voting_time(start_datetime, end_datetime, auto_declare):
+                        # Reset auto-declaration processed flag when new schedule is set
+                        st.session_state.auto_declaration_processed = False
+                        st.success("✅ Voting schedule updated successfully!")
+                        st.rerun()
+                    else:
+                        st.error("❌ Failed to update schedule!")
 
         with col2:
-            if st.button("🕧 30 Minutes", use_container_width=True):
-                start_time = get_india_time()
-                end_time = start_time + timedelta(minutes=30)
-                if set_voting_time(start_time, end_time, True):
-                    st.session_state.auto_declaration_processed = False
-                    st.success("✅ 30-minute voting set!")
+            if st.form_submit_button("🟢 Enable Now"):
+                if set_voting_time(india_now, None, False):
+                    st.success("✅ Voting enabled!")
                     st.rerun()
+                else:
+                    st.error("❌ Failed to enable voting!")
 
         with col3:
-            if st.button("🕘 45 Minutes", use_container_width=True):
-                start_time = get_india_time()
-                end_time = start_time + timedelta(minutes=45)
-                if set_voting_time(start_time, end_time, True):
-                    st.session_state.auto_declaration_processed = False
-                    st.success("✅ 45-minute voting set!")
+            if st.form_submit_button("🔴 Disable Voting"):
+                if apply_settings({'voting_enabled': 0}):
+                    st.success("✅ Voting disabled!")
                     st.rerun()
+                else:
+                    st.error("❌ Failed to disable voting!")
 
-        with col4:
-            if st.button("🕐 1 Hour", use_container_width=True):
-                start_time = get_india_time()
-                end_time = start_time + timedelta(hours=1)
-                if set_voting_time(start_time, end_time, True):
-                    st.session_state.auto_declaration_processed = False
-                    st.success("✅ 1-hour voting set!")
-                    st.rerun()
+    st.markdown("---")
 
-        # Advanced settings
-        st.markdown("---")
-        st.markdown("### 🔧 Advanced Settings")
+    # Updated Quick time presets (15, 30, 45 minutes - removed 1 week)
+    st.markdown("### ⚡ Quick Presets")
+    for col, (label, minutes, name) in zip(st.columns(len(PRESETS)), PRESETS):
+        if col.button(label, use_container_width=True):
+            _apply_preset(india_now, minutes, name)
+
+    # Advanced settings
+    st.markdown("---")
+    st.markdown("### 🔧 Advanced Settings")
 
-        if current_settings:
-            col1, col2 = st.columns(2)
+    if current_settings:
+        col1, col2 = st.columns(2)
 
-            with col1:
-                if st.button("🗑️ Clear Schedule", type="secondary", use_container_width=True):
-                    conn = sqlite3.connect('voting_system.db')
-                    cursor = conn.cursor()
-                    cursor.execute('DELETE FROM voting_settings')
-                    conn.commit()
-                    conn.close()
+        with col1:
+            if st.button("🗑️ Clear Schedule", type="secondary", use_container_width=True):
+                if clear_voting_schedule():
                     st.success("✅ Schedule cleared!")
                     st.rerun()
+                else:
+                    st.error("❌ Failed to clear schedule!")
 
-            with col2:
-                current_auto = current_settings.get('auto_declare_winner', True)
-                if st.button(f"{'🔴 Disable' if current_auto else '🟢 Enable'} Auto-Declaration",
-                             use_container_width=True):
-                    conn = sqlite3.connect('voting_system.db')
-                    cursor = conn.cursor()
-                    cursor.execute('UPDATE voting_settings SET auto_declare_winner = ?', (not current_auto,))
-                    conn.commit()
-                    conn.close()
+        with col2:
+            current_auto = current_settings.get('auto_declare_winner', True)
+            if st.button(f"{'🔴 Disable' if current_auto else '🟢 Enable'} Auto-Declaration",
+                         use_container_width=True):
+                if apply_settings({'auto_declare_winner': int(not current_auto)}):
                     st.success(f"✅ Auto-declaration {'disabled' if current_auto else 'enabled'}!")
                     st.rerun()
+                else:
+                    st.error("❌ Failed to update auto-declaration!")
+
+
+def show_admin_panel():
+    """Display admin panel with all administrative functions"""
+    if not st.session_state.admin_logged_in:
+        st.session_state.page = 'admin_login'
+        st.rerun()
+        return
+
+    st.title("👨‍💼 Admin Panel")
+
+    # Display current India time
+    current_time = get_india_time()
+    st.info(f"🕐 Current Time (India): {current_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
+
+    col1, col2 = st.columns([6, 1])
+    with col2:
+        if st.button("Logout"):
+            st.session_state.admin_logged_in = False
+            st.session_state.page = 'home'
+            st.rerun()
+
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+        ["📊 Voting Results", "👥 Student Data", "✅ Voted Students", "🏆 Declare Winner", "🔄 Re-Election",
+         "⏰ Time Settings"])
+
+    with tab1:
+        _results_tab()
+
+    with tab2:
+        _students_tab()
+
+    with tab3:
+        _voted_students_tab()
+
+    with tab4:
+        _declare_winner_tab()
+
+    with tab5:
+        _re_election_tab()
+
+    with tab6:
+        _time_settings_tab()
 
 
 # Main application
@@ -1229,7 +1568,6 @@ def main():
     )
 
     # Initialize database and session state
-    init_database()
     init_session_state()
 
     # Route to appropriate page